@@ -1,55 +1,121 @@
 import pandas as pd
 import pdfplumber
+import fitz  # PyMuPDF
 import os
 import numpy as np
-import matplotlib.pyplot as plt
 from datetime import datetime
-from sklearn.linear_model import LinearRegression
-import sys, time
+import sys
 import re
 import subprocess
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Pola nominal negatif seperti -21,500 atau -1.250.000 (dikompilasi sekali saja)
+_NOMINAL_RE = re.compile(r"-\s?[0-9\.\,]+")
+
+# Folder cache hasil parsing PDF (parquet), di samping script ini
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# Naikkan setiap kali logika parsing PDF berubah supaya cache lama tidak dipakai lagi
+_CACHE_VERSION = 3
+
+# Jumlah halaman per potongan saat membaca PDF dengan pdfplumber
+PDF_CHUNK_HALAMAN = 50
 
 # --------------------------
 # 1. Fungsi bantu: bersihkan nominal format Indonesia
 # --------------------------
 def bersihkan_nominal(nominal):
-    nominal = str(nominal)
-    nominal = nominal.replace("+", "").replace("-", "").replace(" ", "")
-    nominal = nominal.replace(".", "").replace(",", ".")
-    try:
-        return float(nominal)
-    except:
-        return 0.0
+    """
+    Bersihkan kolom nominal (pd.Series berisi string) sekaligus dalam satu
+    operasi vektor. Hasilnya selalu float64; nilai yang tidak bisa dikonversi menjadi 0.0.
+    """
+    nominal = nominal.astype(str).str.replace(r"[+\-\s.]", "", regex=True)
+    nominal = nominal.str.replace(",", ".", regex=False)
+    return pd.to_numeric(nominal, errors="coerce").fillna(0.0).astype(np.float64)
 
 
 # --------------------------
 # 2. Ekstraksi transaksi harian dari PDF Jago
 # --------------------------
+def _gabung_kata_per_baris(words, y_tolerance=3):
+    """
+    Susun ulang kata dari PyMuPDF (get_text("words")) jadi baris teks.
+    Sel tabel digambar terpisah, jadi kata dikelompokkan per posisi vertikal
+    supaya satu baris transaksi tetap jadi satu baris (seperti pdfplumber).
+    """
+    baris = []
+    for w in sorted(words, key=lambda w: (w[1], w[0])):
+        if baris and abs(w[1] - baris[-1][0]) <= y_tolerance:
+            baris[-1][1].append(w)
+        else:
+            baris.append((w[1], [w]))
+    return "\n".join(
+        " ".join(w[4] for w in sorted(kata, key=lambda w: w[0]))
+        for _, kata in baris
+    )
+
+
+def _baca_teks_halaman(path_pdf):
+    """
+    Ambil teks per halaman (mulai halaman 3) memakai PyMuPDF.
+    Kalau PyMuPDF gagal membuka/membaca PDF, pakai pdfplumber sebagai cadangan.
+    """
+    try:
+        doc = fitz.open(path_pdf)
+        try:
+            # Biasanya transaksi mulai dari halaman 3
+            return [_gabung_kata_per_baris(doc.load_page(pno).get_text("words"))
+                    for pno in range(2, doc.page_count)]
+        finally:
+            doc.close()
+    except Exception as e:
+        print(f"[WARNING] PyMuPDF gagal membaca {os.path.basename(path_pdf)} ({e}), pakai pdfplumber")
+
+    # extract_text_simple cukup mengelompokkan karakter per baris (koordinat y),
+    # tanpa analisis layout/kolom yang tidak dibutuhkan untuk pola nominal
+    # Halaman dibuka per potongan supaya objek halaman tidak menumpuk di memori
+    # (nomor halaman pdfplumber dimulai dari 1, jadi halaman 3 = nomor 3)
+    with pdfplumber.open(path_pdf) as pdf:
+        total_halaman = len(pdf.pages)
+    teks = []
+    for start in range(3, total_halaman + 1, PDF_CHUNK_HALAMAN):
+        nomor = list(range(start, min(start + PDF_CHUNK_HALAMAN, total_halaman + 1)))
+        with pdfplumber.open(path_pdf, pages=nomor) as chunk:
+            teks.extend(page.extract_text_simple() for page in chunk.pages)
+    return teks
+
+
 def extract_transaksi_harian_jago(path_pdf):
     """
     Ekstraksi transaksi harian dari PDF Bank Jago.
     Fokus hanya pada pengeluaran (angka negatif, contoh: -21,500)
     """
-    data = []
-
-    with pdfplumber.open(path_pdf) as pdf:
-        # Biasanya transaksi mulai dari halaman 3
-        for page in pdf.pages[2:]:
-            text = page.extract_text()
-            if not text:
+    desc_list = []
+    nom_list = []
+
+    for text in _baca_teks_halaman(path_pdf):
+        if not text:
+            continue
+        lines = text.split("\n")
+        for line in lines:
+            # baris tanpa tanda "-" pasti bukan pengeluaran, lewati sebelum regex
+            if "-" not in line:
                 continue
-            lines = text.split("\n")
-            for line in lines:
-                # cari pola nominal negatif seperti -21,500 atau -1.250.000
-                match = re.findall(r"-\s?[0-9\.\,]+", line)
-                if match:
-                    nominal = bersihkan_nominal(match[-1])
-                    if nominal > 0:  # simpan nilai absolut
-                        data.append({
-                            "Deskripsi": line.strip(),
-                            "Pengeluaran": nominal
-                        })
-    df = pd.DataFrame(data)
+            # cari pola nominal negatif seperti -21,500 atau -1.250.000
+            # hanya match terakhir yang dipakai, jadi tidak perlu menyimpan semua match
+            match = None
+            for match in _NOMINAL_RE.finditer(line):
+                pass
+            if match:
+                # simpan string mentah, dibersihkan sekaligus setelah loop
+                desc_list.append(line.strip())
+                nom_list.append(match.group())
+    df = pd.DataFrame({"Deskripsi": desc_list, "Pengeluaran": nom_list})
+    if not df.empty:
+        df["Pengeluaran"] = bersihkan_nominal(df["Pengeluaran"])
+        df = df[df["Pengeluaran"] > 0].reset_index(drop=True)  # simpan nilai absolut
     if not df.empty:
         print(f"[INFO] Ditemukan {len(df)} transaksi dari {os.path.basename(path_pdf)}")
     return df
@@ -58,6 +124,38 @@ def extract_transaksi_harian_jago(path_pdf):
 # --------------------------
 # 3. Gabungkan semua PDF jadi satu DataFrame
 # --------------------------
+def _path_cache(path_pdf):
+    """
+    Lokasi file cache parquet untuk sebuah PDF, dikunci dengan versi parser, path,
+    mtime, dan ukuran file supaya PDF yang berubah otomatis diparse ulang.
+    """
+    key = (f"{_CACHE_VERSION}:{os.path.abspath(path_pdf)}:"
+           f"{os.path.getmtime(path_pdf)}:{os.path.getsize(path_pdf)}")
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".parquet")
+
+
+def _simpan_cache(df, cache_path):
+    """
+    Tulis cache parquet lewat file sementara lalu os.replace, supaya program yang
+    terhenti di tengah jalan tidak meninggalkan file cache setengah jadi.
+    Gagal menulis cache (folder read-only, disk penuh, dll) cukup jadi warning.
+    """
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".parquet.tmp")
+        os.close(fd)
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[WARNING] Gagal menyimpan cache ke {CACHE_DIR} ({e})")
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
 def pdfs_to_dataframe(folder_pdf):
     all_data = []
     pdf_files = [f for f in os.listdir(folder_pdf) if f.lower().endswith(".pdf")]
@@ -65,10 +163,38 @@ def pdfs_to_dataframe(folder_pdf):
         print("[WARNING] Tidak ada PDF ditemukan di folder:", folder_pdf)
         return pd.DataFrame()
 
+    # PDF yang sudah pernah diparse (mtime + ukuran sama) langsung dibaca dari cache
+    hasil = {}
+    belum_cache = []
     for pdf_file in pdf_files:
-        path_pdf = os.path.join(folder_pdf, pdf_file)
+        cache_path = _path_cache(os.path.join(folder_pdf, pdf_file))
+        if os.path.exists(cache_path):
+            try:
+                hasil[pdf_file] = pd.read_parquet(cache_path)
+                print(f"[INFO] Memakai cache untuk: {pdf_file}")
+                continue
+            except Exception as e:
+                print(f"[WARNING] Cache {pdf_file} rusak ({e}), PDF diparse ulang")
         print(f"[INFO] Membaca transaksi dari: {pdf_file}")
-        df = extract_transaksi_harian_jago(path_pdf)
+        belum_cache.append(pdf_file)
+
+    if belum_cache:
+        # Tiap PDF diproses independen, jadi bisa dibagi ke beberapa proses
+        # (satu PDF saja langsung diparse, biaya start proses worker lebih mahal)
+        paths_pdf = [os.path.join(folder_pdf, f) for f in belum_cache]
+        if len(paths_pdf) == 1:
+            parsed = [extract_transaksi_harian_jago(paths_pdf[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=min(os.cpu_count() or 1, 4, len(paths_pdf))) as ex:
+                parsed = list(ex.map(extract_transaksi_harian_jago, paths_pdf))
+
+        for pdf_file, path_pdf, df in zip(belum_cache, paths_pdf, parsed):
+            # hasil kosong juga disimpan supaya PDF tanpa transaksi tidak diparse ulang
+            _simpan_cache(df, _path_cache(path_pdf))
+            hasil[pdf_file] = df
+
+    for pdf_file in pdf_files:
+        df = hasil[pdf_file]
         if not df.empty:
             all_data.append(df)
         else:
@@ -81,8 +207,8 @@ def pdfs_to_dataframe(folder_pdf):
     full_data = pd.concat(all_data, ignore_index=True)
 
     # --- filter transaksi yang realistis (hapus Rp0 dan Rp besar ekstrem) ---
-    full_data = full_data[full_data["Pengeluaran"] > 0]
-    full_data["Pengeluaran"] = full_data["Pengeluaran"].astype(float)
+    # (bersihkan_nominal meng-cast eksplisit ke float64, jadi kolom tidak perlu di-cast/copy lagi)
+    full_data = full_data.loc[full_data["Pengeluaran"] > 0]
 
     return full_data
 
@@ -115,11 +241,10 @@ def filter_pengeluaran_rutin(data, percentile_batas=75, frekuensi_min=3):
     if data.empty:
         return data
     
-    # Statistik dasar
-    Q1 = data["Pengeluaran"].quantile(0.25)  # Kuartil 1
-    Q3 = data["Pengeluaran"].quantile(0.75)  # Kuartil 3
+    # Statistik dasar (Q1, median, Q3 dihitung sekaligus dalam satu panggilan)
+    arr = data["Pengeluaran"].to_numpy(dtype=np.float64)
+    Q1, median, Q3 = np.percentile(arr, [25, 50, 75])
     IQR = Q3 - Q1
-    median = data["Pengeluaran"].median()
     
     # Batas atas menggunakan IQR (LEBIH KETAT untuk mahasiswa)
     # Kita pakai 1.5*IQR (standar box plot) karena pengeluaran mahasiswa relatif homogen
@@ -134,20 +259,21 @@ def filter_pengeluaran_rutin(data, percentile_batas=75, frekuensi_min=3):
     batas_bawah = max(Q1 * 0.5, 5_000)  # Minimal Rp5rb (parkir, aqua, dll tetap masuk)
     
     # Filter 1: Buang outlier ekstrem (transaksi besar sekali-kali)
-    data_filtered = data[
-        (data["Pengeluaran"] >= batas_bawah) & 
-        (data["Pengeluaran"] <= batas_atas)
-    ].copy()
+    mask = (arr >= batas_bawah) & (arr <= batas_atas)
+    kept = arr[mask]
     
     # Filter 2: Fokus pada range persentil LEBIH KETAT untuk mahasiswa perantauan
     # Ambil 60% data tengah (buang 20% terbawah dan 20% teratas)
     # Ini lebih fokus pada pengeluaran "normal" sehari-hari
-    p20 = data_filtered["Pengeluaran"].quantile(0.20)
-    p80 = data_filtered["Pengeluaran"].quantile(0.80)
-    data_filtered = data_filtered[
-        (data_filtered["Pengeluaran"] >= p20) & 
-        (data_filtered["Pengeluaran"] <= p80)
-    ]
+    if kept.size:
+        p20, p80 = np.percentile(kept, [20, 80])
+    else:
+        p20 = p80 = np.nan
+
+    # Gabungkan kedua filter jadi satu mask, tanpa DataFrame perantara
+    final_mask = np.zeros_like(arr, dtype=bool)
+    final_mask[mask] = (kept >= p20) & (kept <= p80)
+    data_filtered = data.loc[final_mask]
     
     # Info untuk debugging
     print(f"\n📊 Analisis Pengeluaran MAHASISWA PERANTAUAN:")
@@ -168,41 +294,40 @@ def filter_pengeluaran_rutin(data, percentile_batas=75, frekuensi_min=3):
 
 
 # --------------------------
-# 5. Latih model Linear Regression (opsional, untuk tren)
+# 5. Tren linear pengeluaran (opsional)
 # --------------------------
 def train_model(data):
+    """
+    Tren linear pengeluaran per hari: y = slope * hari + intercept.
+    Mengembalikan (slope, intercept), atau None kalau data kurang dari 3.
+    """
     if len(data) < 3:
         return None
-    data = data.reset_index(drop=True)
-    data["Hari"] = np.arange(1, len(data) + 1)
-    X = data["Hari"].values.reshape(-1, 1)
-    y = data["Pengeluaran"].values
-    model = LinearRegression()
-    model.fit(X, y)
-    return model
+    hari = np.arange(1, len(data) + 1)
+    slope, intercept = np.polyfit(hari, data["Pengeluaran"].to_numpy(dtype=np.float64), 1)
+    return slope, intercept
 
 
 # --------------------------
 # 6. Prediksi harian yang realistis - UNTUK MAHASISWA PERANTAUAN
 # --------------------------
 def prediksi_harian(saldo_saat_ini, tanggal_input, data_asli):
-    # Parsing tanggal
-    try:
-        tanggal_input = pd.to_datetime(tanggal_input.strip(), dayfirst=False, errors="raise")
-    except Exception:
-        try:
-            tanggal_input = pd.to_datetime(tanggal_input.strip(), dayfirst=True, errors="raise")
-        except Exception:
-            for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d %B %Y", "%d %b %Y"):
-                try:
-                    tanggal_input = datetime.strptime(tanggal_input.strip(), fmt)
-                    break
-                except:
-                    continue
-            else:
-                print("⚠️ Format tanggal tidak dikenali. Gunakan format 2025-10-20 atau 20-10-2025.")
-                
-                return
+    # Parsing tanggal: coba parser pandas dulu (tanpa raise), baru format manual
+    teks_tanggal = tanggal_input.strip()
+    tanggal_input = pd.to_datetime(teks_tanggal, format="mixed", dayfirst=False, errors="coerce")
+    if pd.isna(tanggal_input):
+        tanggal_input = pd.to_datetime(teks_tanggal, format="mixed", dayfirst=True, errors="coerce")
+    if pd.isna(tanggal_input):
+        for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%d %B %Y", "%d %b %Y"):
+            try:
+                tanggal_input = datetime.strptime(teks_tanggal, fmt)
+                break
+            except:
+                continue
+        else:
+            print("⚠️ Format tanggal tidak dikenali. Gunakan format 2025-10-20 atau 20-10-2025.")
+            
+            return
 
     hari_bulan = 30
     hari_sekarang = tanggal_input.day
@@ -213,22 +338,8 @@ def prediksi_harian(saldo_saat_ini, tanggal_input, data_asli):
         
         return
 
-   
-    # Animasi proses dengan sound effect (15 detik)
-    print("\n🤖 AI sedang menganalisis pola pengeluaran rutin harian... ", end="")
-    
-    # 50 karakter loading bar dalam 15 detik = 0.3 detik per karakter
-    total_steps = 50
-    duration = 15  # detik
-    delay = duration / total_steps  # 0.3 detik per step
-    
-    for i in range(total_steps):
-        sys.stdout.write("█")
-        sys.stdout.flush()
-        time.sleep(delay)
-        
-    
-    print(" ✅\n")
+
+    print("\n🤖 AI sedang menganalisis pola pengeluaran rutin harian...")
 
     # Filter hanya pengeluaran rutin (kebutuhan hidup mahasiswa)
     data_rutin = filter_pengeluaran_rutin(data_asli)
@@ -239,9 +350,11 @@ def prediksi_harian(saldo_saat_ini, tanggal_input, data_asli):
         return
 
     # Hitung rata-rata dan median (median lebih robust terhadap outlier)
-    rata_harian = data_rutin["Pengeluaran"].mean()
-    median_harian = data_rutin["Pengeluaran"].median()
-    std_harian = data_rutin["Pengeluaran"].std()
+    arr = data_rutin["Pengeluaran"].to_numpy(dtype=np.float64)
+    rata_harian = arr.mean()
+    median_harian = np.median(arr)
+    # ddof=1 sama dengan default pandas .std(); satu data saja -> NaN tanpa warning
+    std_harian = arr.std(ddof=1) if arr.size > 1 else np.nan
     
     # Gunakan median + 15% sebagai estimasi konservatif untuk mahasiswa
     # +15% karena ada kemungkinan pengeluaran mendadak (sakit, traktir teman, dll)
@@ -310,18 +423,14 @@ def prediksi_harian(saldo_saat_ini, tanggal_input, data_asli):
     print("\n📊 SIMULASI SALDO HARIAN (berdasarkan pola pengeluaran rutin):")
     print("-" * 70)
     
-    saldo = saldo_saat_ini
-    saldo_harian = [saldo]
-    tanggal_list = [hari_sekarang]
-    
-    for i in range(1, sisa_hari + 1):
-        saldo -= estimasi_harian
-        saldo_harian.append(saldo)
-        tanggal_list.append(hari_sekarang + i)
+    # Saldo turun konstan tiap hari, jadi cukup satu ekspresi numpy
+    days = np.arange(0, sisa_hari + 1)
+    saldo_harian = saldo_saat_ini - estimasi_harian * days
+    tanggal_list = hari_sekarang + days
     
     # Buat bar chart ASCII
-    max_val = max(saldo_harian)
-    min_val = min(min(saldo_harian), 0)
+    max_val = saldo_harian.max()
+    min_val = min(saldo_harian.min(), 0)
     range_val = max_val - min_val
     
     if range_val > 0:
@@ -329,37 +438,40 @@ def prediksi_harian(saldo_saat_ini, tanggal_input, data_asli):
     else:
         scale = 1
     
-    for i, (tgl, saldo_val) in enumerate(zip(tanggal_list, saldo_harian)):
-        if i == 0:
-            label = f"Hari {tgl:02d} (sekarang)"
-        else:
-            label = f"Hari {tgl:02d}"
-        
-        if saldo_val >= 0:
-            bar_len = int((saldo_val - min_val) * scale)
-            bar = "█" * bar_len
-            warna = "🟢" if saldo_val > 200_000 else "🟡" if saldo_val > 100_000 else "🟠"
-        else:
-            bar_len = int(abs(saldo_val - min_val) * scale)
-            bar = "▓" * bar_len
-            warna = "🔴"
-        
-        print(f"{warna} {label:20s}: {bar:42s} Rp{saldo_val:>12,.0f}")
+    # Panjang bar dihitung sekaligus, lalu semua baris ditulis dalam satu write()
+    bar_lens = ((saldo_harian - min_val) * scale).astype(np.int64).tolist()
+    saldo_list = saldo_harian.tolist()
+    labels = [f"Hari {tgl:02d}" for tgl in tanggal_list.tolist()]
+    labels[0] += " (sekarang)"
+    bars = ["█" * b if s >= 0 else "▓" * b for b, s in zip(bar_lens, saldo_list)]
+    warna = [
+        "🔴" if s < 0 else "🟢" if s > 200_000 else "🟡" if s > 100_000 else "🟠"
+        for s in saldo_list
+    ]
+    sys.stdout.write("".join(
+        f"{w} {label:20s}: {bar:42s} Rp{s:>12,.0f}\n"
+        for w, label, bar, s in zip(warna, labels, bars, saldo_list)
+    ))
     
     print("-" * 70)
 
-    # Simpan grafik
+    # Simpan grafik (matplotlib baru di-import di sini supaya program cepat start)
+    import matplotlib
+    matplotlib.use("Agg")  # hanya simpan ke file, tidak perlu GUI
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(10, 6))
     plt.plot(tanggal_list, saldo_harian, "-o", linewidth=2, markersize=6, 
              color='#2E86AB', label="Prediksi Saldo")
     plt.axhline(y=0, color="red", linestyle="--", linewidth=1.5, label="Batas Habis")
     plt.axhline(y=100_000, color="orange", linestyle=":", linewidth=1, label="Zona Risiko")
     
+    pos_mask = saldo_harian >= 0
     plt.fill_between(tanggal_list, saldo_harian, 0, 
-                     where=[s >= 0 for s in saldo_harian], 
+                     where=pos_mask, 
                      alpha=0.3, color='green', label='Saldo Positif')
     plt.fill_between(tanggal_list, saldo_harian, 0, 
-                     where=[s < 0 for s in saldo_harian], 
+                     where=~pos_mask, 
                      alpha=0.3, color='red', label='Defisit')
     
     plt.title("📈 Prediksi Saldo Harian Mahasiswa Perantauan", fontsize=14, fontweight='bold')